@@ -10,32 +10,27 @@ Original file is located at
 
 """
 
+import sys
+
 import numpy as np
-from scipy.stats import norm
+from scipy.special import ndtr
+
+# Shared PCG64 generator, reused across calls instead of the legacy global state
+_rng = np.random.default_rng()
 
 #We set up the well known formula of Black-Scholes for option pricing:
 def BSM(St, K, T, r, sigma, OPT):
   d1 = (np.log(St/K)+(r + 0.5*sigma**2)*T)/(np.sqrt(T) * sigma)
   d2 = d1 - sigma * np.sqrt(T)
   if OPT == "call":
-    price = St*norm.cdf(d1) - K*np.exp(-r*T) * norm.cdf(d2)
+    price = St*ndtr(d1) - K*np.exp(-r*T) * ndtr(d2)
   else:
-    price = -St*norm.cdf(-d1)+K*np.exp(-r*T) * norm.cdf(-d2)
+    price = -St*ndtr(-d1)+K*np.exp(-r*T) * ndtr(-d2)
   return price
 
-# Ask the user for the option type
-option_type = input("Would you like to evaluate a 'put' or a 'call' option? ").strip().lower()
-
-# Check user input and calculate the option price
-if option_type in ["put", "call"]:
-    price = BSM(100, 105, 2, 0.05, 0.2, option_type)
-    print(f"The price of the {option_type} option is: {price: }")
-else:
-    print("Invalid input. Please choose 'put' or 'call'.")
-
 """#Monte Carlo Simulation for Option Pricing
 
-Using the Monte Carlo method, we generate N scenarios for stock price ST, where the stock price follows a Gometric Brownian Motion. The variables used include: initial price S0, strike price K, time to maturity T, risk-free rate r, and volatility sigma, with an additional random shock Z, sampled from a Standard Normal Distribution, which can be generated using np.random.standard_normal.
+Using the Monte Carlo method, we generate N scenarios for stock price ST, where the stock price follows a Gometric Brownian Motion. The variables used include: initial price S0, strike price K, time to maturity T, risk-free rate r, and volatility sigma, with an additional random shock Z, sampled from a Standard Normal Distribution, which can be generated using the standard_normal method of a NumPy random Generator.
 
 The idea is that for each scenario, a value for Z and S_T is generated. Then, S_T is compared with strike price K and:
 
@@ -47,9 +42,13 @@ Essentially, we calculate the payoff under each scenario. The final option price
 
 import numpy as np
 
-def monte_carlo_option_pricing(S0, K, T, r, sigma, N, option_type="call"):
+def monte_carlo_option_pricing(S0, K, T, r, sigma, N, option_type="call", rng=None):
+    # Callers can pass a seeded generator for reproducible prices
+    if rng is None:
+        rng = _rng
+
     # Generate random numbers Z (random shock)
-    Z = np.random.standard_normal(N)
+    Z = rng.standard_normal(N)
 
     # Simulate ST prices using geometric Brownian motion
     ST = S0 * np.exp((r - 0.5 * sigma**2) * T + sigma * Z * np.sqrt(T))
@@ -65,17 +64,37 @@ def monte_carlo_option_pricing(S0, K, T, r, sigma, N, option_type="call"):
 
     return option_price
 
-S0 = 100  # Initial stock price
-K = 105   # Strike price
-T = 1     # Time to maturity
-r = 0.04  # Risk-free rate
-sigma = 0.2  # Volatility
-N = 100000  # Number of simulations
-
-# Call option price
-call_price = monte_carlo_option_pricing(S0, K, T, r, sigma, N, option_type="call")
-print(f"Call option price: {call_price}")
-
-# Put option price
-put_price = monte_carlo_option_pricing(S0, K, T, r, sigma, N, option_type="put")
-print(f"Put option price: {put_price}")
+def main(option_type):
+    # Check the option type and calculate the option price
+    if option_type in ["put", "call"]:
+        price = BSM(100, 105, 2, 0.05, 0.2, option_type)
+        print(f"The price of the {option_type} option is: {price: }")
+    else:
+        price = None
+        print("Invalid input. Please choose 'put' or 'call'.")
+
+    S0 = 100  # Initial stock price
+    K = 105   # Strike price
+    T = 1     # Time to maturity
+    r = 0.04  # Risk-free rate
+    sigma = 0.2  # Volatility
+    N = 100000  # Number of simulations
+
+    # Call option price
+    call_price = monte_carlo_option_pricing(S0, K, T, r, sigma, N, option_type="call")
+    print(f"Call option price: {call_price}")
+
+    # Put option price
+    put_price = monte_carlo_option_pricing(S0, K, T, r, sigma, N, option_type="put")
+    print(f"Put option price: {put_price}")
+
+    return price, call_price, put_price
+
+if __name__ == "__main__":
+    # Take the option type from the command line, or ask the user for it
+    if len(sys.argv) > 1:
+        option_type = sys.argv[1].strip().lower()
+    else:
+        option_type = input("Would you like to evaluate a 'put' or a 'call' option? ").strip().lower()
+
+    main(option_type)
@@ -18,34 +18,103 @@ Original file is located at
 
 """
 
+import math
+
 import numpy as np
-from scipy.stats import norm
+from scipy.special import ndtr, ndtri
+from scipy.stats import qmc
+
+# Shared PCG64 generator, reused across calls instead of the legacy global state
+_rng = np.random.default_rng()
+
+#Scalar Black-Scholes with the math module: for single floats, NumPy/scipy dispatch
+#costs far more than the arithmetic itself, while math.log/exp/erfc are plain C calls.
+def _bsm_scalar(St, K, T, r, sigma, OPT):
+  sqrtT = math.sqrt(T)
+  d1 = (math.log(St/K)+(r + 0.5*sigma*sigma)*T)/(sqrtT * sigma)
+  d2 = d1 - sigma * sqrtT
+  disc = math.exp(-r*T)
+  # Normal CDF through erfc: N(x) = 0.5*erfc(-x/sqrt(2)), which unlike 0.5*(1 + erf(x/sqrt(2)))
+  # keeps full relative accuracy in the lower tail, matching ndtr
+  if OPT == "call":
+    return St*0.5*math.erfc(-d1*0.7071067811865475) - K*disc*0.5*math.erfc(-d2*0.7071067811865475)
+  return -St*0.5*math.erfc(d1*0.7071067811865475) + K*disc*0.5*math.erfc(d2*0.7071067811865475)
 
 #We set up the well known formula of Black-Scholes for option pricing:
 def BSM(St, K, T, r, sigma, OPT):
+  if np.isscalar(St) and np.isscalar(K) and np.isscalar(T) and np.isscalar(r) and np.isscalar(sigma):
+    #Degenerate inputs (zero maturity or volatility, non-positive or infinite prices, NaN,
+    #overflowing rates) go to the NumPy path below, which returns inf/nan with a warning
+    #instead of raising
+    if St > 0 and K > 0 and T > 0 and sigma > 0:
+      try:
+        return _bsm_scalar(St, K, T, r, sigma, OPT)
+      except (ValueError, OverflowError):
+        pass
   d1 = (np.log(St/K)+(r + 0.5*sigma**2)*T)/(np.sqrt(T) * sigma)
   d2 = d1 - sigma * np.sqrt(T)
   if OPT == "call":
-    price = St*norm.cdf(d1) - K*np.exp(-r*T) * norm.cdf(d2)
+    price = St*ndtr(d1) - K*np.exp(-r*T) * ndtr(d2)
   else:
-    price = -St*norm.cdf(-d1)+K*np.exp(-r*T) * norm.cdf(-d2)
+    price = -St*ndtr(-d1)+K*np.exp(-r*T) * ndtr(-d2)
   return price
 
-def monte_carlo_option_pricing(S0, K, T, r, sigma, N, option_type="call"):
-    # Generate random numbers Z (random shock)
-    Z = np.random.standard_normal(N)
+def monte_carlo_option_pricing(S0, K, T, r, sigma, N, option_type="call", use_antithetic=True, method="mc", rng=None):
+    # Generate random numbers Z (random shock) in single precision: the Monte Carlo
+    # error ~1/sqrt(N) dwarfs float32 rounding, and half the bytes means half the
+    # memory traffic. This only suits the simulation, BSM stays in double precision.
+    Z = np.empty(N, dtype=np.float32)
+
+    # Antithetic variates: draw half the shocks and mirror them as -Z, which
+    # lowers the variance of the estimator for the same N
+    half = N // 2 if use_antithetic else 0
+    n_draws = N - half
+
+    # Callers can pass a seeded generator for reproducible prices
+    if rng is None:
+        rng = _rng
+    if method == "mc":
+        rng.standard_normal(n_draws, dtype=np.float32, out=Z[:n_draws])
+    elif method == "qmc":
+        # Quasi-Monte Carlo: scrambled Sobol points mapped through the inverse
+        # normal CDF fill the distribution evenly, converging close to O(1/N).
+        # That balance only holds for a power-of-2 number of points, so the
+        # draws (N, or N/2 with antithetic variates) must be a power of 2.
+        if n_draws < 1 or n_draws & (n_draws - 1):
+            raise ValueError(
+                f"method='qmc' needs a power-of-2 number of Sobol draws, got {n_draws}. "
+                "Use N = 2**m, or N = 2**(m + 1) with use_antithetic=True."
+            )
+        sobol = qmc.Sobol(d=1, scramble=True, seed=rng)
+        Z[:n_draws] = ndtri(sobol.random_base2(n_draws.bit_length() - 1).ravel())
+    else:
+        raise ValueError("Invalid method. Use 'mc' or 'qmc'.")
+
+    np.negative(Z[:half], out=Z[n_draws:])
+
+    # Drift and diffusion of log(ST / S0) are the same for every scenario
+    mu = np.float32((r - 0.5 * sigma**2) * T)
+    vol = np.float32(sigma * np.sqrt(T))
 
-    # Simulate ST prices using geometric Brownian motion
-    ST = S0 * np.exp((r - 0.5 * sigma**2) * T + sigma * Z * np.sqrt(T))
+    # Simulate ST prices using geometric Brownian motion, reusing Z's memory
+    np.multiply(Z, vol, out=Z)
+    Z += mu
+    np.exp(Z, out=Z)
+    Z *= S0
 
-    # Calculate payoff
+    # Calculate payoff in place
     if option_type == "call":
-        payoff = np.maximum(0, ST - K)
+        np.subtract(Z, K, out=Z)
     elif option_type == "put":
-        payoff = np.maximum(0, K - ST)
+        np.subtract(K, Z, out=Z)
+    else:
+        raise ValueError("Invalid option type. Use 'call' or 'put'.")
+    np.maximum(Z, 0, out=Z)
 
-    # Option price: discounted mean of payoffs
-    option_price = np.exp(-r * T) * np.mean(payoff)
+    # Option price: discounted mean of payoffs. A single add.reduce pass over the
+    # payoffs, accumulated in double precision, with the 1/N folded into the discount.
+    total = Z.sum(dtype=np.float64)
+    option_price = np.exp(-r * T) / N * total
 
     return option_price
 